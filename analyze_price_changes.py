@@ -1,4 +1,7 @@
 import pandas as pd
+import numpy as np
+
+from process_sales_data import pink_morsel_mask, read_sales_csv
 
 def analyze_price_changes():
     """Analyze price changes across all three data files"""
@@ -9,54 +12,48 @@ def analyze_price_changes():
         'data/daily_sales_data_2.csv'
     ]
     
-    all_pink_data = []
+    # Read every file in one go, keeping only pink morsels tagged with their source file
+    combined = pd.concat(
+        (
+            df[pink_morsel_mask(df['product'])].assign(file=i)
+            for i, df in enumerate(read_sales_csv(file) for file in files)
+        ),
+        ignore_index=True
+    )
+    combined = combined.sort_values('date', kind='mergesort', ignore_index=True)
+    
+    # A single aggregate gives both the per-file and the overall price views; only the
+    # handful of resulting (file, price) rows get sorted
+    summary = combined.groupby(['file', 'price'], sort=False).agg(
+        min=('date', 'min'), max=('date', 'max'), count=('date', 'count')
+    ).sort_index()
     
-    for i, file in enumerate(files):
-        print(f"Analyzing File {i}: {file}")
-        df = pd.read_csv(file)
-        pink = df[df['product'].str.lower() == 'pink morsel'].copy()
-        
-        # Clean price and convert to float
-        pink['price'] = pink['price'].str.replace('$', '').astype(float)
-        
-        print(f"  Date range: {pink['date'].min()} to {pink['date'].max()}")
-        print(f"  Unique prices: {pink['price'].unique()}")
-        print(f"  Records: {len(pink)}")
-        
-        # Group by price to see when changes occurred
-        price_summary = pink.groupby('price').agg({
-            'date': ['min', 'max', 'count']
-        }).round(2)
+    for i, file_summary in summary.groupby(level='file', sort=False):
+        file_summary = file_summary.droplevel('file')
+        print(f"Analyzing File {i}: {files[i]}")
+        print(f"  Date range: {file_summary['min'].min().date()} to {file_summary['max'].max().date()}")
+        print(f"  Unique prices: {file_summary.index.to_numpy()}")
+        print(f"  Records: {file_summary['count'].sum()}")
         print(f"  Price summary:")
-        print(price_summary)
+        print(file_summary)
         print()
-        
-        all_pink_data.append(pink)
-    
-    # Combine all data
-    combined = pd.concat(all_pink_data, ignore_index=True)
-    combined['date'] = pd.to_datetime(combined['date'])
-    combined = combined.sort_values('date')
     
     print("=== OVERALL ANALYSIS ===")
     print(f"Total date range: {combined['date'].min().date()} to {combined['date'].max().date()}")
-    print(f"Unique prices: {sorted(combined['price'].unique())}")
+    # Price tiers come from the k-row price timeline rather than the full column
+    price_changes = summary.groupby(level='price', sort=False).agg({'min': 'min', 'max': 'max'}).sort_index()
+    unique_prices = np.unique(price_changes.index.to_numpy())
+    print(f"Unique prices: {unique_prices}")
     
     # Find price change points
-    price_changes = combined.groupby('price').agg({
-        'date': ['min', 'max']
-    }).round(2)
     print(f"\nPrice change timeline:")
     print(price_changes)
     
     # Check for any price increases
-    unique_prices = sorted(combined['price'].unique())
     if len(unique_prices) > 1:
+        increases = np.diff(unique_prices) / unique_prices[:-1] * 100
         print(f"\n💰 PRICE INCREASES DETECTED:")
-        for i in range(len(unique_prices) - 1):
-            old_price = unique_prices[i]
-            new_price = unique_prices[i + 1]
-            increase = ((new_price - old_price) / old_price) * 100
+        for old_price, new_price, increase in zip(unique_prices[:-1], unique_prices[1:], increases):
             print(f"  {old_price} → {new_price} (+{increase:.1f}%)")
     else:
         print(f"\n📊 No price changes detected - price remained at ${unique_prices[0]}")
@@ -1,137 +1,118 @@
+import functools
+import os
+import tempfile
+from pathlib import Path
 import dash
 from dash import dcc, html
 from dash.dependencies import Input, Output
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
 
+from _fastagg import daily_sales_sum
+from viz import PRICE_CHANGE_DATE, build_sales_figure
+
+# Regions in a fixed categorical order, so region filters compare small integer codes
+REGIONS = ['north', 'south', 'east', 'west']
+
+# Formatted sales data written by process_sales_data.py, next to this file
+DATA_PARQUET = Path(__file__).with_name('formatted_sales_data.parquet')
+DATA_CSV = Path(__file__).with_name('formatted_sales_data.csv')
+
+# Gitignored Parquet cache of the CSV, used only when the formatted Parquet file is missing
+DATA_CACHE = Path(__file__).with_name('soul_foods.parquet')
+
+# Parse the CSV with the multi-threaded pyarrow engine; set SOULFOODS_FAST_IO=0 for pandas' C engine.
+# pyarrow itself is required either way, since it also reads the Parquet file.
+FAST_IO = os.getenv('SOULFOODS_FAST_IO', '1') == '1'
+
 # Initialize the Dash app
 app = dash.Dash(__name__)
 
-# Load and process the data
+def read_formatted_csv(path=None):
+    """Read the formatted sales CSV with column types declared up front"""
+    options = dict(
+        usecols=['sales', 'date', 'region'],
+        dtype={'sales': 'float32', 'region': 'category'},
+        parse_dates=['date'],
+        date_format='%Y-%m-%d'
+    )
+    path = DATA_CSV if path is None else path
+    return pd.read_csv(path, engine='pyarrow' if FAST_IO else 'c', **options)
+
+def write_data_cache(df):
+    """Write the CSV cache atomically; if the write fails (e.g. read-only checkout), skip the cache"""
+    tmp = None
+    try:
+        fd, tmp = tempfile.mkstemp(dir=DATA_CACHE.parent, prefix=DATA_CACHE.name, suffix='.tmp')
+        os.close(fd)
+        df.to_parquet(tmp, compression='snappy', index=False)
+        # Swap the finished file in with one rename, so concurrent workers never see a partial cache
+        os.replace(tmp, DATA_CACHE)
+    except (OSError, ImportError):
+        if tmp is not None:
+            Path(tmp).unlink(missing_ok=True)
+
+# Load and process the data once per process; callers must not mutate the result
+@functools.lru_cache(maxsize=1)
 def load_data():
-    df = pd.read_csv('formatted_sales_data.csv')
-    df['date'] = pd.to_datetime(df['date'])
-    return df
+    columns = ['sales', 'date', 'region']
+    if DATA_PARQUET.exists():
+        # process_sales_data.py's Parquet output is the source of truth; the CSV is only a copy
+        df = pd.read_parquet(DATA_PARQUET, columns=columns)
+    elif DATA_CACHE.exists() and (
+        not DATA_CSV.exists() or DATA_CACHE.stat().st_mtime >= DATA_CSV.stat().st_mtime
+    ):
+        # The cache is at least as new as the CSV, so skip the CSV parse
+        df = pd.read_parquet(DATA_CACHE, columns=columns)
+    else:
+        df = read_formatted_csv()
+        write_data_cache(df)
+    # astype() treats unordered categoricals with the same values as equal, so rebuild
+    # explicitly to pin the category order regardless of how the file stored it
+    df['region'] = pd.Categorical(df['region'], categories=REGIONS)
+    # Guarantee date order (already true for our files, so the stable sort is a cheap pass);
+    # callers can then split on a date with searchsorted instead of a full mask
+    return df.sort_values('date', kind='stable', ignore_index=True)
 
-# Create the visualization
-def create_figure(selected_region='all'):
+# Split the data by region once so callbacks do a dict lookup instead of a full scan
+@functools.lru_cache(maxsize=1)
+def load_region_frames():
     df = load_data()
+    frames = dict(tuple(df.groupby('region', sort=False, observed=True)))
+    frames['all'] = df
+    return frames
+
+# Aggregate daily sales per region once; the tables are tiny (one row per day).
+# Each record also keeps the peak daily sales used to place the chart annotation.
+@functools.lru_cache(maxsize=1)
+def load_daily_sales():
+    records = {}
+    for region, frame in load_region_frames().items():
+        daily = daily_sales_sum(frame)
+        records[region] = {'daily': daily, 'max_sales': daily['sales'].max()}
+    return records
+
+def get_region_frame(selected_region):
+    frames = load_region_frames()
+    # Unknown regions get an empty frame with the same columns
+    return frames.get(selected_region, frames['all'].iloc[0:0])
+
+# Create the visualization, memoized per region since the figure only depends on it
+@functools.lru_cache(maxsize=8)
+def create_figure(selected_region='all'):
+    # Look up the pre-aggregated daily total sales
+    daily_by_region = load_daily_sales()
+    if selected_region in daily_by_region:
+        record = daily_by_region[selected_region]
+    else:
+        record = {'daily': daily_by_region['all']['daily'].iloc[0:0], 'max_sales': 0.0}
     
-    # Filter by region if not 'all'
-    if selected_region != 'all':
-        df = df[df['region'] == selected_region]
-    
-    # Group by date and calculate daily total sales
-    daily_sales = df.groupby('date')['sales'].sum().reset_index()
-    daily_sales = daily_sales.sort_values('date')
-    
-    # Add price information based on date
-    def get_price(date):
-        if date < pd.to_datetime('2021-01-15'):
-            return 3.0
-        else:
-            return 5.0
-    
-    daily_sales['price'] = daily_sales['date'].apply(get_price)
-    
-    # Create the visualization
-    fig = make_subplots(
-        rows=2, cols=1,
-        subplot_titles=(f'Daily Sales Over Time - {selected_region.title()} Region', 'Price Changes'),
-        vertical_spacing=0.1,
-        row_heights=[0.7, 0.3]
-    )
-    
-    # Add sales line
-    fig.add_trace(
-        go.Scatter(
-            x=daily_sales['date'],
-            y=daily_sales['sales'],
-            mode='lines',
-            name='Daily Sales',
-            line=dict(color='#FF69B4', width=3),
-            hovertemplate='<b>Date:</b> %{x}<br>' +
-                         '<b>Sales:</b> $%{y:,.0f}<br>' +
-                         '<extra></extra>'
-        ),
-        row=1, col=1
-    )
-    
-    # Add price change line
-    fig.add_trace(
-        go.Scatter(
-            x=daily_sales['date'],
-            y=daily_sales['price'],
-            mode='lines',
-            name='Price',
-            line=dict(color='#FF4500', width=3),
-            hovertemplate='<b>Date:</b> %{x}<br>' +
-                         '<b>Price:</b> $%{y}<br>' +
-                         '<extra></extra>'
-        ),
-        row=2, col=1
-    )
-    
-    # Add vertical line for price change
-    price_change_date = pd.to_datetime('2021-01-15')
-    fig.add_vline(
-        x=price_change_date,
-        line_dash="dash",
-        line_color="red",
-        line_width=2,
-        row=1, col=1
-    )
-    
-    fig.add_vline(
-        x=price_change_date,
-        line_dash="dash", 
-        line_color="red",
-        line_width=2,
-        row=2, col=1
-    )
-    
-    # Add annotation for price change
-    if len(daily_sales) > 0:
-        fig.add_annotation(
-            x=price_change_date,
-            y=daily_sales['sales'].max() * 0.9,
-            text="Price Increase:<br>$3.00 → $5.00",
-            showarrow=True,
-            arrowhead=2,
-            arrowsize=1,
-            arrowwidth=2,
-            arrowcolor="red",
-            bgcolor="white",
-            bordercolor="red",
-            borderwidth=1,
-            row=1, col=1
-        )
-    
-    # Update layout
-    fig.update_layout(
-        title={
-            'text': f'Pink Morsels Sales Analysis - {selected_region.title()} Region',
-            'x': 0.5,
-            'xanchor': 'center',
-            'font': {'size': 20, 'color': '#2E86AB'}
-        },
-        xaxis_title="Date",
-        yaxis_title="Daily Sales ($)",
-        yaxis2_title="Price ($)",
-        height=700,
-        showlegend=True,
-        hovermode='x unified',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)'
+    return build_sales_figure(
+        record['daily'],
+        title=f'Pink Morsels Sales Analysis - {selected_region.title()} Region',
+        sales_title=f'Daily Sales Over Time - {selected_region.title()} Region',
+        max_sales=record['max_sales'],
+        dashboard=True
     )
-    
-    # Update axes
-    fig.update_xaxes(title_text="Date", row=2, col=1, gridcolor='lightgray')
-    fig.update_yaxes(title_text="Daily Sales ($)", row=1, col=1, gridcolor='lightgray')
-    fig.update_yaxes(title_text="Price ($)", row=2, col=1, gridcolor='lightgray')
-    
-    return fig
 
 # App layout with enhanced styling
 app.layout = html.Div([
@@ -196,21 +177,15 @@ app.layout = html.Div([
     [Input('region-filter', 'value')]
 )
 def update_chart(selected_region):
-    df = load_data()
-    
-    # Filter by region if not 'all'
-    if selected_region != 'all':
-        df_filtered = df[df['region'] == selected_region]
-    else:
-        df_filtered = df
+    df_filtered = get_region_frame(selected_region)
     
-    # Calculate insights
-    price_change_date = pd.to_datetime('2021-01-15')
-    before_data = df_filtered[df_filtered['date'] < price_change_date]
-    after_data = df_filtered[df_filtered['date'] >= price_change_date]
+    # Calculate insights; region frames keep load_data's date order, so split on the
+    # price change date with a binary search and average the contiguous NumPy slices
+    sales = df_filtered['sales'].to_numpy()
+    split = df_filtered['date'].values.searchsorted(PRICE_CHANGE_DATE)
     
-    before_avg = before_data['sales'].mean() if len(before_data) > 0 else 0
-    after_avg = after_data['sales'].mean() if len(after_data) > 0 else 0
+    before_avg = sales[:split].mean() if split > 0 else 0
+    after_avg = sales[split:].mean() if split < len(sales) else 0
     
     sales_change = ((after_avg - before_avg) / before_avg * 100) if before_avg > 0 else 0
     
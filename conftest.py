@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the project modules (app, viz, ...) importable from the tests, ahead of site-packages
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
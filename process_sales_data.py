@@ -1,11 +1,37 @@
+import argparse
 import pandas as pd
-import os
+import numpy as np
 
-def process_sales_data():
+# Schema of the raw daily sales files
+SALES_COLUMNS = ['product', 'price', 'quantity', 'date', 'region']
+PINK_DTYPES = {'product': 'category', 'quantity': 'int32', 'region': 'category'}
+
+def read_sales_csv(file_path):
+    """Read a raw daily sales file with a predeclared schema, parsing '$3.00'-style prices to float"""
+    # pyarrow is required (it also writes the Parquet output), so always use its
+    # multi-threaded CSV parser. It has no converters, so strip the '$' with Arrow
+    # string kernels instead.
+    df = pd.read_csv(
+        file_path,
+        engine='pyarrow',
+        usecols=SALES_COLUMNS,
+        dtype={**PINK_DTYPES, 'price': 'string[pyarrow]'},
+        parse_dates=['date'],
+        date_format='%Y-%m-%d'
+    )
+    df['price'] = df['price'].str.slice(1).astype('float64')
+    return df
+
+def pink_morsel_mask(products):
+    """Case-insensitive Pink Morsel mask, compared on the category codes rather than the strings"""
+    pink_codes = np.flatnonzero(products.cat.categories.str.lower() == 'pink morsel')
+    return products.cat.codes.isin(pink_codes)
+
+def process_sales_data(csv=False):
     """
     Process the three CSV files containing Soul Foods morsel sales data.
     Filter for pink morsels only, calculate sales (price * quantity),
-    and output a single formatted CSV file.
+    and output a single formatted Parquet file (plus a CSV copy when csv is True).
     """
     
     # List of CSV files to process
@@ -23,45 +49,50 @@ def process_sales_data():
         print(f"Processing {file_path}...")
         
         # Read the CSV file
-        df = pd.read_csv(file_path)
+        df = read_sales_csv(file_path)
         
         # Filter for pink morsels only (case-insensitive)
-        pink_morsels = df[df['product'].str.lower() == 'pink morsel'].copy()
+        mask = pink_morsel_mask(df['product']).to_numpy()
         
-        if len(pink_morsels) == 0:
+        if not mask.any():
             print(f"Warning: No pink morsels found in {file_path}")
             continue
         
-        # Clean price column by removing '$' and converting to float
-        pink_morsels['price'] = pink_morsels['price'].str.replace('$', '').astype(float)
-        
-        # Calculate sales (price * quantity)
-        pink_morsels['sales'] = pink_morsels['price'] * pink_morsels['quantity']
-        
-        # Select only the required columns: sales, date, region
-        final_df = pink_morsels[['sales', 'date', 'region']].copy()
+        # Build the required columns (sales = price * quantity, date, region) straight
+        # from the masked arrays instead of copying a filtered frame. Sales fit float32
+        # exactly (whole dollars well below 2**24) and quantity is already read as int32.
+        final_df = pd.DataFrame({
+            'sales': (df['price'].to_numpy()[mask] * df['quantity'].to_numpy()[mask]).astype(np.float32),
+            'date': df['date'].to_numpy()[mask],
+            'region': df['region'].array[mask]
+        })
         
         processed_dfs.append(final_df)
         
-        print(f"  - Found {len(pink_morsels)} pink morsel records")
+        print(f"  - Found {len(final_df)} pink morsel records")
     
     # Combine all processed dataframes
     if processed_dfs:
         combined_df = pd.concat(processed_dfs, ignore_index=True)
         
         # Sort by date for better organization
-        combined_df = combined_df.sort_values('date')
+        combined_df = combined_df.sort_values('date', kind='mergesort', ignore_index=True)
         
-        # Save to output file
-        output_file = 'formatted_sales_data.csv'
-        combined_df.to_csv(output_file, index=False)
+        # Save to a typed, columnar Parquet file; the CSV copy is only for human inspection
+        # (the CSV goes first so the Parquet file is never older than it)
+        output_file = 'formatted_sales_data.parquet'
+        if csv:
+            combined_df.to_csv('formatted_sales_data.csv', index=False)
+        combined_df.to_parquet(output_file, compression='snappy', index=False)
         
         print(f"\n✅ Processing complete!")
         print(f"📊 Total records: {len(combined_df)}")
-        print(f"📅 Date range: {combined_df['date'].min()} to {combined_df['date'].max()}")
+        print(f"📅 Date range: {combined_df['date'].min().date()} to {combined_df['date'].max().date()}")
         print(f"🌍 Regions: {', '.join(combined_df['region'].unique())}")
         print(f"💰 Sales range: ${combined_df['sales'].min():.2f} to ${combined_df['sales'].max():.2f}")
         print(f"💾 Output saved to: {output_file}")
+        if csv:
+            print(f"💾 CSV copy saved to: formatted_sales_data.csv")
         
         # Display first few rows
         print(f"\n📋 First 5 rows of output:")
@@ -73,4 +104,8 @@ def process_sales_data():
         return None
 
 if __name__ == "__main__":
-    process_sales_data() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the formatted Pink Morsels sales data")
+    parser.add_argument('--csv', action='store_true',
+                        help="also write formatted_sales_data.csv for human inspection")
+    args = parser.parse_args()
+    process_sales_data(csv=args.csv) 
\ No newline at end of file
@@ -54,8 +54,8 @@ check_files() {
         missing_files+=("simple_test.py")
     fi
     
-    if [ ! -f "formatted_sales_data.csv" ]; then
-        missing_files+=("formatted_sales_data.csv")
+    if [ ! -f "formatted_sales_data.parquet" ]; then
+        missing_files+=("formatted_sales_data.parquet")
     fi
     
     if [ ${#missing_files[@]} -ne 0 ]; then
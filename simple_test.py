@@ -1,118 +1,124 @@
+import logging
 import unittest
 import pandas as pd
-import sys
-import os
-
-# Add the current directory to the path so we can import our app
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import numpy as np
 
 from app import load_data, create_figure
 
+# Per-test progress messages; only shown when this file is run directly
+log = logging.getLogger(__name__)
+
+# Pink Morsel price change date, as a NumPy scalar compared directly against date arrays
+PRICE_CHANGE_DATE = np.datetime64('2021-01-15', 'ns')
+
 class TestCoreFunctionality(unittest.TestCase):
     """Test core functionality of the Soul Foods application"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Load the dataset once for the class"""
+        cls.df = load_data()
+    
     def test_data_loading(self):
         """Test that data loads correctly"""
-        print("Testing data loading...")
+        log.debug("Testing data loading...")
         df = load_data()
         
         # Basic checks
         self.assertIsInstance(df, pd.DataFrame)
         self.assertGreater(len(df), 0)
-        print(f"✅ Data loaded successfully: {len(df)} records")
+        log.debug("✅ Data loaded successfully: %d records", len(df))
         
         # Column checks
         required_columns = ['sales', 'date', 'region']
         for col in required_columns:
             self.assertIn(col, df.columns)
-        print(f"✅ All required columns present: {required_columns}")
+        log.debug("✅ All required columns present: %s", required_columns)
         
         # Data type checks
         self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['date']))
         self.assertTrue(pd.api.types.is_numeric_dtype(df['sales']))
-        print("✅ Data types are correct")
+        log.debug("✅ Data types are correct")
     
     def test_region_filtering(self):
         """Test region filtering functionality"""
-        print("Testing region filtering...")
-        df = load_data()
+        log.debug("Testing region filtering...")
+        df = self.df
         
+        # Count every region in a single pass
         regions = ['north', 'south', 'east', 'west']
+        counts = df.groupby('region', sort=False, observed=True).size()
         for region in regions:
-            filtered_df = df[df['region'] == region]
-            self.assertGreater(len(filtered_df), 0)
-            print(f"✅ {region.title()} region: {len(filtered_df)} records")
+            with self.subTest(region=region):
+                self.assertGreater(counts.get(region, 0), 0)
+                log.debug("✅ %s region: %d records", region.title(), counts[region])
     
     def test_figure_creation(self):
         """Test that figures can be created for all regions"""
-        print("Testing figure creation...")
+        log.debug("Testing figure creation...")
         
         regions = ['all', 'north', 'south', 'east', 'west']
         for region in regions:
-            try:
-                fig = create_figure(region)
-                self.assertIsNotNone(fig)
-                print(f"✅ Figure created for {region} region")
-            except Exception as e:
-                self.fail(f"Failed to create figure for {region}: {e}")
+            with self.subTest(region=region):
+                try:
+                    fig = create_figure(region)
+                    self.assertIsNotNone(fig)
+                    log.debug("✅ Figure created for %s region", region)
+                except Exception as e:
+                    self.fail(f"Failed to create figure for {region}: {e}")
     
     def test_sales_analysis(self):
         """Test sales analysis calculations"""
-        print("Testing sales analysis...")
-        df = load_data()
+        log.debug("Testing sales analysis...")
+        df = self.df
         
-        # Test price change date analysis
-        price_change_date = pd.to_datetime('2021-01-15')
-        before_data = df[df['date'] < price_change_date]
-        after_data = df[df['date'] >= price_change_date]
+        # Test price change date analysis; load_data returns rows in date order, so the
+        # split is a binary search and both halves are contiguous slices
+        sales = df['sales'].to_numpy()
+        split = df['date'].values.searchsorted(PRICE_CHANGE_DATE)
         
-        self.assertGreater(len(before_data), 0)
-        self.assertGreater(len(after_data), 0)
+        self.assertGreater(split, 0)
+        self.assertLess(split, len(sales))
         
-        before_avg = before_data['sales'].mean()
-        after_avg = after_data['sales'].mean()
+        before_avg = sales[:split].mean()
+        after_avg = sales[split:].mean()
         
-        print(f"✅ Before price increase: ${before_avg:,.0f} average daily sales")
-        print(f"✅ After price increase: ${after_avg:,.0f} average daily sales")
+        log.debug("✅ Before price increase: $%.0f average daily sales", before_avg)
+        log.debug("✅ After price increase: $%.0f average daily sales", after_avg)
         
         # Calculate percentage change
         change_pct = ((after_avg - before_avg) / before_avg) * 100
-        print(f"✅ Sales change: {change_pct:+.1f}%")
+        log.debug("✅ Sales change: %+.1f%%", change_pct)
         
         # Verify the expected result (sales should be higher after price increase)
         self.assertGreater(after_avg, before_avg)
-        print("✅ Sales increased after price increase (as expected)")
+        log.debug("✅ Sales increased after price increase (as expected)")
     
     def test_data_integrity(self):
         """Test data integrity and reasonableness"""
-        print("Testing data integrity...")
-        df = load_data()
-        
-        # Check for missing values
-        missing_sales = df['sales'].isnull().sum()
-        missing_dates = df['date'].isnull().sum()
-        missing_regions = df['region'].isnull().sum()
+        log.debug("Testing data integrity...")
+        df = self.df
         
-        self.assertEqual(missing_sales, 0)
-        self.assertEqual(missing_dates, 0)
-        self.assertEqual(missing_regions, 0)
-        print("✅ No missing values found")
+        # Check for missing values in one pass; per-column counts only on failure
+        missing = df[['sales', 'date', 'region']].isna()
+        if missing.values.any():
+            self.fail(f"Missing values found: {missing.sum().to_dict()}")
+        log.debug("✅ No missing values found")
         
-        # Check sales are positive
-        negative_sales = (df['sales'] <= 0).sum()
-        self.assertEqual(negative_sales, 0)
-        print("✅ All sales values are positive")
+        # Check sales are positive with a single NumPy reduction
+        self.assertTrue((df['sales'].to_numpy() > 0).all())
+        log.debug("✅ All sales values are positive")
         
         # Check date range
         min_date = df['date'].min()
         max_date = df['date'].max()
-        print(f"✅ Date range: {min_date.date()} to {max_date.date()}")
+        log.debug("✅ Date range: %s to %s", min_date.date(), max_date.date())
         
         # Check regions
         unique_regions = df['region'].unique()
         expected_regions = ['north', 'south', 'east', 'west']
         self.assertEqual(set(unique_regions), set(expected_regions))
-        print(f"✅ All expected regions present: {list(unique_regions)}")
+        log.debug("✅ All expected regions present: %s", list(unique_regions))
 
 def run_simple_tests():
     """Run the simple test suite"""
@@ -120,9 +126,8 @@ def run_simple_tests():
     print("=" * 60)
     
     # Create test suite
-    test_suite = unittest.TestSuite()
-    tests = unittest.TestLoader().loadTestsFromTestCase(TestCoreFunctionality)
-    test_suite.addTests(tests)
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite([loader.loadTestsFromTestCase(TestCoreFunctionality)])
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
@@ -143,5 +148,6 @@ def run_simple_tests():
         return False
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(message)s')
     success = run_simple_tests()
     exit(0 if success else 1) 
\ No newline at end of file
@@ -1,23 +1,27 @@
+import os
 import unittest
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
-from dash.testing.application_runners import import_app
-from dash.testing.composite import DashComposite
-from dash.testing.browser import Browser
-import sys
-import os
 
-# Add the current directory to the path so we can import our app
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import app as app_module
+from app import load_data, create_figure, read_formatted_csv
+from _fastagg import daily_sales_sum
 
-from app import load_data, create_figure
+# Pink Morsel price change date, as a NumPy scalar compared directly against date arrays
+PRICE_CHANGE_DATE = np.datetime64('2021-01-15', 'ns')
 
 class TestDataProcessing(unittest.TestCase):
     """Test data processing functions"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.test_data = pd.DataFrame({
+    @classmethod
+    def setUpClass(cls):
+        """Set up test data once for the class"""
+        cls.test_data = pd.DataFrame({
             'sales': [1500, 1600, 1700, 1800, 1900],
             'date': pd.to_datetime(['2018-02-06', '2018-02-07', '2018-02-08', '2018-02-09', '2018-02-10']),
             'region': ['north', 'south', 'east', 'west', 'north']
@@ -39,13 +43,119 @@ class TestDataProcessing(unittest.TestCase):
         # Check data types
         self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['date']))
         self.assertTrue(pd.api.types.is_numeric_dtype(df['sales']))
-        self.assertTrue(pd.api.types.is_object_dtype(df['region']))
+        self.assertEqual(df['sales'].dtype, np.float32)
+        
+        # Check rows come back in date order
+        self.assertTrue(df['date'].is_monotonic_increasing)
+        self.assertIsInstance(df['region'].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(df['region'].cat.categories), ['north', 'south', 'east', 'west'])
         
         # Check regions
         expected_regions = ['north', 'south', 'east', 'west']
         for region in df['region'].unique():
             self.assertIn(region, expected_regions)
     
+    def test_csv_fallback_matches_parquet(self):
+        """Test that the CSV fallback reads the same typed data as the Parquet file"""
+        df = load_data()
+        csv_df = read_formatted_csv()
+        
+        self.assertEqual(len(csv_df), len(df))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(csv_df['date']))
+        self.assertEqual(csv_df['sales'].dtype, df['sales'].dtype)
+        self.assertIsInstance(csv_df['region'].dtype, pd.CategoricalDtype)
+        self.assertTrue(np.array_equal(np.sort(csv_df['sales'].to_numpy()), np.sort(df['sales'].to_numpy())))
+    
+    def load_with_paths(self, parquet_path, csv_path, cache_path):
+        """Run an uncached load_data against the given files, recording which readers ran"""
+        with mock.patch.object(app_module, 'DATA_PARQUET', parquet_path), \
+                mock.patch.object(app_module, 'DATA_CSV', csv_path), \
+                mock.patch.object(app_module, 'DATA_CACHE', cache_path), \
+                mock.patch.object(app_module, 'read_formatted_csv', wraps=read_formatted_csv) as csv_reader, \
+                mock.patch.object(app_module.pd, 'read_parquet', wraps=pd.read_parquet) as parquet_reader:
+            load_data.cache_clear()
+            try:
+                df = load_data()
+            finally:
+                load_data.cache_clear()
+        return df, csv_reader, parquet_reader
+    
+    def make_files(self, tmp, cache_rows=None, cache_age=0):
+        """Copy the CSV into tmp, optionally with a truncated cache cache_age seconds older than it"""
+        csv_path = Path(tmp) / 'formatted_sales_data.csv'
+        cache_path = Path(tmp) / 'soul_foods.parquet'
+        shutil.copy(app_module.DATA_CSV, csv_path)
+        if cache_rows is not None:
+            # A deliberately short cache, so the result shows which file was read
+            read_formatted_csv(csv_path).head(cache_rows).to_parquet(cache_path, index=False)
+            csv_mtime = csv_path.stat().st_mtime
+            os.utime(cache_path, (csv_mtime - cache_age, csv_mtime - cache_age))
+        return Path(tmp) / 'missing.parquet', csv_path, cache_path
+    
+    def test_load_data_prefers_formatted_parquet(self):
+        """Test that the formatted Parquet file wins over a newer CSV and is never rewritten"""
+        with tempfile.TemporaryDirectory() as tmp:
+            parquet_path = Path(tmp) / 'formatted_sales_data.parquet'
+            shutil.copy(app_module.DATA_PARQUET, parquet_path)
+            _, csv_path, cache_path = self.make_files(tmp)
+            os.utime(parquet_path, (0, 0))
+            
+            df, csv_reader, parquet_reader = self.load_with_paths(parquet_path, csv_path, cache_path)
+            
+            csv_reader.assert_not_called()
+            self.assertEqual(parquet_reader.call_args.args[0], parquet_path)
+            self.assertEqual(parquet_path.stat().st_mtime, 0)
+            self.assertFalse(cache_path.exists())
+        self.assertEqual(len(df), len(load_data()))
+    
+    def test_load_data_reads_fresh_cache(self):
+        """Test that a cache at least as new as the CSV is read instead of the CSV"""
+        with tempfile.TemporaryDirectory() as tmp:
+            parquet_path, csv_path, cache_path = self.make_files(tmp, cache_rows=10, cache_age=-60)
+            
+            df, csv_reader, parquet_reader = self.load_with_paths(parquet_path, csv_path, cache_path)
+            
+            csv_reader.assert_not_called()
+            self.assertEqual(parquet_reader.call_args.args[0], cache_path)
+        self.assertEqual(len(df), 10)
+        self.assertEqual(list(df['region'].cat.categories), ['north', 'south', 'east', 'west'])
+    
+    def test_load_data_refreshes_stale_cache(self):
+        """Test that a CSV newer than the cache is parsed and the cache rewritten from it"""
+        with tempfile.TemporaryDirectory() as tmp:
+            parquet_path, csv_path, cache_path = self.make_files(tmp, cache_rows=10, cache_age=60)
+            
+            from_csv, csv_reader, parquet_reader = self.load_with_paths(parquet_path, csv_path, cache_path)
+            
+            csv_reader.assert_called_once()
+            parquet_reader.assert_not_called()
+            self.assertGreaterEqual(cache_path.stat().st_mtime, csv_path.stat().st_mtime)
+            self.assertEqual(list(Path(tmp).glob('*.tmp')), [])
+            
+            # The next start reads the refreshed cache
+            from_cache, csv_reader, _ = self.load_with_paths(parquet_path, csv_path, cache_path)
+            csv_reader.assert_not_called()
+        
+        self.assertEqual(len(from_csv), len(load_data()))
+        self.assertEqual(len(from_cache), len(from_csv))
+        self.assertEqual(from_cache['sales'].dtype, from_csv['sales'].dtype)
+    
+    def test_load_data_survives_unwritable_cache(self):
+        """Test that a failed cache write still returns the CSV data"""
+        with tempfile.TemporaryDirectory() as tmp:
+            parquet_path, csv_path, _ = self.make_files(tmp)
+            cache_path = Path(tmp) / 'no_such_dir' / 'soul_foods.parquet'
+            
+            df, csv_reader, _ = self.load_with_paths(parquet_path, csv_path, cache_path)
+            
+            csv_reader.assert_called_once()
+            self.assertFalse(cache_path.exists())
+        self.assertEqual(len(df), len(load_data()))
+    
+    def test_load_data_is_cached(self):
+        """Test that load_data parses the file once and shares the frame"""
+        self.assertIs(load_data(), load_data())
+    
     def test_create_figure_all_regions(self):
         """Test create_figure function with 'all' regions"""
         fig = create_figure('all')
@@ -65,13 +175,19 @@ class TestDataProcessing(unittest.TestCase):
         regions = ['north', 'south', 'east', 'west']
         
         for region in regions:
-            fig = create_figure(region)
-            
-            # Check that figure is created
-            self.assertIsInstance(fig, go.Figure)
-            
-            # Check subplot titles contain region name
-            self.assertIn(region.title(), fig.layout.title.text)
+            with self.subTest(region=region):
+                fig = create_figure(region)
+                
+                # Check that figure is created
+                self.assertIsInstance(fig, go.Figure)
+                
+                # Check subplot titles contain region name
+                self.assertIn(region.title(), fig.layout.title.text)
+    
+    def test_create_figure_is_memoized(self):
+        """Test that repeated calls for a region return the cached figure"""
+        self.assertIs(create_figure('north'), create_figure('north'))
+        self.assertIsNot(create_figure('north'), create_figure('south'))
     
     def test_create_figure_empty_data(self):
         """Test create_figure function handles empty data gracefully"""
@@ -82,24 +198,28 @@ class TestDataProcessing(unittest.TestCase):
 class TestDataValidation(unittest.TestCase):
     """Test data validation and integrity"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Load the dataset once for the class"""
+        cls.df = load_data()
+    
     def test_sales_data_integrity(self):
         """Test that sales data is reasonable"""
-        df = load_data()
+        df = self.df
         
-        # Check sales are positive
-        self.assertTrue((df['sales'] > 0).all())
+        # Check sales are positive and within a reasonable range (based on our known data,
+        # less than $10k per day) in one pass; NaN fails both comparisons, so it is caught too
+        sales = df['sales'].to_numpy()
+        self.assertTrue(((sales > 0) & (sales < 10000)).all())
         
-        # Check sales are within reasonable range (based on our known data)
-        self.assertTrue((df['sales'] < 10000).all())  # Should be less than $10k per day
-        
-        # Check no missing values
-        self.assertFalse(df['sales'].isnull().any())
-        self.assertFalse(df['date'].isnull().any())
-        self.assertFalse(df['region'].isnull().any())
+        # Check no missing values in one pass; per-column counts only on failure
+        missing = df[['sales', 'date', 'region']].isna()
+        if missing.values.any():
+            self.fail(f"Missing values found: {missing.sum().to_dict()}")
     
     def test_date_range(self):
         """Test that dates are within expected range"""
-        df = load_data()
+        df = self.df
         
         # Check date range (should be 2018-2022 based on our data)
         min_date = df['date'].min()
@@ -110,44 +230,46 @@ class TestDataValidation(unittest.TestCase):
     
     def test_region_distribution(self):
         """Test that all regions have data"""
-        df = load_data()
+        df = self.df
         
-        regions = df['region'].value_counts()
+        # Count rows per region straight from the categorical codes in one C-level pass
+        counts = np.bincount(df['region'].cat.codes.to_numpy(), minlength=4)
         
         # Check all four regions have data
-        self.assertEqual(len(regions), 4)
+        self.assertEqual(counts.size, 4)
+        self.assertGreater(counts.min(), 0)
         
         # Check regions are roughly balanced (within 20% of each other)
-        min_count = regions.min()
-        max_count = regions.max()
-        balance_ratio = min_count / max_count
+        balance_ratio = counts.min() / counts.max()
         self.assertGreater(balance_ratio, 0.8)
 
 class TestPriceChangeAnalysis(unittest.TestCase):
     """Test price change analysis logic"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Load the dataset once for the class"""
+        cls.df = load_data()
+    
     def test_price_change_date_identification(self):
         """Test that price change date is correctly identified"""
-        df = load_data()
-        
-        # Price change should be on 2021-01-15
-        price_change_date = pd.to_datetime('2021-01-15')
+        df = self.df
         
-        # Check that we have data before and after this date
-        before_data = df[df['date'] < price_change_date]
-        after_data = df[df['date'] >= price_change_date]
+        # Price change should be on 2021-01-15; check that we have data before and after it
+        split = df['date'].values.searchsorted(PRICE_CHANGE_DATE)
         
-        self.assertGreater(len(before_data), 0)
-        self.assertGreater(len(after_data), 0)
+        self.assertGreater(split, 0)
+        self.assertLess(split, len(df))
     
     def test_sales_comparison_logic(self):
         """Test sales comparison before and after price change"""
-        df = load_data()
-        price_change_date = pd.to_datetime('2021-01-15')
+        df = self.df
         
-        # Calculate averages
-        before_avg = df[df['date'] < price_change_date]['sales'].mean()
-        after_avg = df[df['date'] >= price_change_date]['sales'].mean()
+        # Calculate both averages over contiguous slices of the date-ordered data
+        sales = df['sales'].to_numpy()
+        split = df['date'].values.searchsorted(PRICE_CHANGE_DATE)
+        before_avg = sales[:split].mean()
+        after_avg = sales[split:].mean()
         
         # Check that averages are reasonable
         self.assertGreater(before_avg, 0)
@@ -156,48 +278,71 @@ class TestPriceChangeAnalysis(unittest.TestCase):
         # Check that we can calculate percentage change
         if before_avg > 0:
             change_pct = ((after_avg - before_avg) / before_avg) * 100
-            self.assertIsInstance(change_pct, float)
+            self.assertIsInstance(change_pct, (float, np.floating))
+
+    def test_update_chart_insights(self):
+        """Test that the dashboard callback reports the before/after averages per region"""
+        df = self.df
+        north = df[df['region'] == 'north']
+        before = north['date'].values < PRICE_CHANGE_DATE
+        expected_before = f"${north['sales'][before].mean():,.0f}"
+        expected_after = f"${north['sales'][~before].mean():,.0f}"
+        
+        _, insights, _ = app_module.update_chart('north')
+        
+        self.assertEqual(insights[1].children[1].children, expected_before)
+        self.assertEqual(insights[2].children[1].children, expected_after)
 
 class TestRegionalAnalysis(unittest.TestCase):
     """Test regional analysis functionality"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Load the dataset once for the class"""
+        cls.df = load_data()
+    
     def test_region_filtering(self):
         """Test that region filtering works correctly"""
-        df = load_data()
+        df = self.df
         
         regions = ['north', 'south', 'east', 'west']
         
         for region in regions:
-            filtered_df = df[df['region'] == region]
-            
-            # Check that filtering works
-            self.assertTrue((filtered_df['region'] == region).all())
-            
-            # Check that we have data for each region
-            self.assertGreater(len(filtered_df), 0)
+            with self.subTest(region=region):
+                filtered_df = df[df['region'] == region]
+                
+                # Check that we have data for each region (the filter itself guarantees
+                # every remaining row matches, so there is no per-row recheck)
+                self.assertGreater(len(filtered_df), 0)
     
     def test_regional_sales_comparison(self):
         """Test regional sales comparison"""
-        df = load_data()
+        df = self.df
         
         regions = ['north', 'south', 'east', 'west']
-        regional_averages = {}
         
-        for region in regions:
-            regional_df = df[df['region'] == region]
-            regional_averages[region] = regional_df['sales'].mean()
+        # Counts and averages for every region in a single pass
+        regional = df.groupby('region', sort=False, observed=True)['sales'].agg(['size', 'mean'])
+        self.assertEqual(set(regional.index), set(regions))
         
         # Check that all regions have reasonable sales averages
-        for region, avg in regional_averages.items():
-            self.assertGreater(avg, 0)
-            self.assertLess(avg, 10000)  # Should be reasonable daily sales
+        for region, row in regional.iterrows():
+            with self.subTest(region=region):
+                self.assertGreater(row['size'], 0)
+                self.assertGreater(row['mean'], 0)
+                self.assertLess(row['mean'], 10000)  # Should be reasonable daily sales
 
 class TestFigureProperties(unittest.TestCase):
     """Test figure properties and layout"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Build the 'all' figure once for the class; the tests only read it"""
+        cls.fig = create_figure('all')
+    
     def test_figure_layout_properties(self):
         """Test that figures have correct layout properties"""
-        fig = create_figure('all')
+        fig = self.fig
         
         # Check layout properties
         self.assertIsNotNone(fig.layout.title)
@@ -209,7 +354,7 @@ class TestFigureProperties(unittest.TestCase):
     
     def test_figure_interactivity(self):
         """Test that figures have interactive properties"""
-        fig = create_figure('all')
+        fig = self.fig
         
         # Check hover template exists
         self.assertIsNotNone(fig.data[0].hovertemplate)
@@ -218,40 +363,51 @@ class TestFigureProperties(unittest.TestCase):
         # Check hover mode is set
         self.assertEqual(fig.layout.hovermode, 'x unified')
 
+class TestFastAggregation(unittest.TestCase):
+    """Test the per-date sales aggregation helper"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Load the dataset once for the class"""
+        cls.df = load_data()
+    
+    def test_daily_sales_sum_matches_groupby(self):
+        """Test that daily_sales_sum agrees with a plain pandas groupby"""
+        df = self.df
+        expected = df.groupby('date')['sales'].sum()
+        
+        daily_sales = daily_sales_sum(df)
+        
+        # Check dates are sorted, sales keep the input dtype and totals match
+        self.assertTrue(daily_sales['date'].is_monotonic_increasing)
+        self.assertEqual(daily_sales['sales'].dtype, df['sales'].dtype)
+        self.assertTrue((daily_sales['date'].to_numpy() == expected.index.to_numpy()).all())
+        self.assertTrue(((daily_sales['sales'].to_numpy() - expected.to_numpy()) == 0).all())
+
 class TestAppStructure(unittest.TestCase):
     """Test app structure and components"""
     
-    def test_app_import(self):
-        """Test that app can be imported"""
-        try:
-            from app import app
-            self.assertIsNotNone(app)
-        except ImportError as e:
-            self.fail(f"Failed to import app: {e}")
-    
-    def test_app_layout(self):
-        """Test that app has a layout"""
-        from app import app
-        self.assertIsNotNone(app.layout)
+    def test_app_structure(self):
+        """Test that the module-level Dash app exists and has a layout"""
+        self.assertIsNotNone(app_module.app)
+        self.assertIsNotNone(app_module.app.layout)
 
 def run_tests():
     """Run all tests and return results"""
-    # Create test suite
-    test_suite = unittest.TestSuite()
-    
-    # Add test classes
+    # Test classes to run
     test_classes = [
         TestDataProcessing,
         TestDataValidation,
         TestPriceChangeAnalysis,
         TestRegionalAnalysis,
         TestFigureProperties,
+        TestFastAggregation,
         TestAppStructure
     ]
     
-    for test_class in test_classes:
-        tests = unittest.TestLoader().loadTestsFromTestCase(test_class)
-        test_suite.addTests(tests)
+    # Create test suite with a single loader
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite(loader.loadTestsFromTestCase(c) for c in test_classes)
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
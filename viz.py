@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# Date the Pink Morsel price rose from $3.00 to $5.00
+PRICE_CHANGE_DATE = np.datetime64('2021-01-15')
+
+def build_sales_figure(daily_sales, *, title, sales_title='Daily Sales Over Time',
+                       max_sales=None, dashboard=False):
+    """
+    Build the two-panel daily sales / price figure from a date-sorted daily sales table.
+    max_sales positions the price-change annotation (computed from the table if omitted);
+    dashboard applies the Dash app styling (thicker line, themed title, transparent background).
+    """
+
+    # Add price information based on date (assign returns a copy, leaving the input intact)
+    daily_sales = daily_sales.assign(
+        price=np.where(daily_sales['date'].values < PRICE_CHANGE_DATE, 3.0, 5.0)
+    )
+
+    # Create the visualization
+    fig = make_subplots(
+        rows=2, cols=1,
+        subplot_titles=(sales_title, 'Price Changes'),
+        vertical_spacing=0.1,
+        row_heights=[0.7, 0.3]
+    )
+
+    # Add sales line
+    fig.add_trace(
+        go.Scatter(
+            x=daily_sales['date'],
+            y=daily_sales['sales'],
+            mode='lines',
+            name='Daily Sales',
+            line=dict(color='#FF69B4', width=3 if dashboard else 2),
+            hovertemplate='<b>Date:</b> %{x}<br>' +
+                         '<b>Sales:</b> $%{y:,.0f}<br>' +
+                         '<extra></extra>'
+        ),
+        row=1, col=1
+    )
+
+    # Add price change line
+    fig.add_trace(
+        go.Scatter(
+            x=daily_sales['date'],
+            y=daily_sales['price'],
+            mode='lines',
+            name='Price',
+            line=dict(color='#FF4500', width=3),
+            hovertemplate='<b>Date:</b> %{x}<br>' +
+                         '<b>Price:</b> $%{y}<br>' +
+                         '<extra></extra>'
+        ),
+        row=2, col=1
+    )
+
+    # Add vertical line for price change
+    price_change_date = pd.Timestamp(PRICE_CHANGE_DATE)
+    for row in (1, 2):
+        fig.add_vline(
+            x=price_change_date,
+            line_dash="dash",
+            line_color="red",
+            line_width=2,
+            row=row, col=1
+        )
+
+    # Add annotation for price change
+    if len(daily_sales) > 0:
+        if max_sales is None:
+            max_sales = daily_sales['sales'].max()
+        fig.add_annotation(
+            x=price_change_date,
+            y=max_sales * 0.9,
+            text="Price Increase:<br>$3.00 → $5.00",
+            showarrow=True,
+            arrowhead=2,
+            arrowsize=1,
+            arrowwidth=2,
+            arrowcolor="red",
+            bgcolor="white",
+            bordercolor="red",
+            borderwidth=1,
+            row=1, col=1
+        )
+
+    # Update layout
+    title_font = {'size': 20, 'color': '#2E86AB'} if dashboard else {'size': 20}
+    fig.update_layout(
+        title={
+            'text': title,
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': title_font
+        },
+        xaxis_title="Date",
+        yaxis_title="Daily Sales ($)",
+        yaxis2_title="Price ($)",
+        height=700,
+        showlegend=True,
+        hovermode='x unified'
+    )
+    if dashboard:
+        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
+
+    # Update axes
+    grid = {'gridcolor': 'lightgray'} if dashboard else {}
+    fig.update_xaxes(title_text="Date", row=2, col=1, **grid)
+    fig.update_yaxes(title_text="Daily Sales ($)", row=1, col=1, **grid)
+    fig.update_yaxes(title_text="Price ($)", row=2, col=1, **grid)
+
+    return fig